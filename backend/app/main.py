@@ -2,16 +2,18 @@ from fastapi import FastAPI, WebSocket, WebSocketDisconnect
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.staticfiles import StaticFiles
 import uvicorn
-import json
+import msgspec
 import logging
 import asyncio
-from typing import Dict, List
+import time
+from typing import Any, Dict, Union
+from core.config import settings
 from services.ai.ollama_service import OllamaService
 from services.ai.mediapipe_service import MediaPipeService
 from services.ai.consciousness_service import ConsciousnessService
 
 # Configure logging
-logging.basicConfig(level=logging.INFO)
+logging.basicConfig(level=settings.LOG_LEVEL)
 logger = logging.getLogger(__name__)
 
 app = FastAPI(
@@ -34,57 +36,147 @@ ollama_service = OllamaService()
 mediapipe_service = MediaPipeService()
 consciousness_service = ConsciousnessService()
 
+# WebSocket wire format: binary msgpack frames (tagged on the "type" field).
+# Pose frames carry raw JPEG bytes under data["image"] instead of base64 text.
+class PoseFrame(msgspec.Struct, tag_field="type", tag="pose_frame"):
+    data: Dict[str, Any]
+
+class ChatMessage(msgspec.Struct, tag_field="type", tag="chat_message"):
+    content: str
+
+class ConsciousnessData(msgspec.Struct, tag_field="type", tag="consciousness_data"):
+    data: Dict[str, Any]
+
+enc = msgspec.msgpack.Encoder()
+dec = msgspec.msgpack.Decoder(Union[PoseFrame, ChatMessage, ConsciousnessData])
+
+# Window during which queued outbound messages coalesce into one frame
+FLUSH_WINDOW = 0.005
+
+# Minimum gap between pose inferences per session (~15 fps); frames that
+# arrive faster are answered with the cached result
+POSE_MIN_INTERVAL = 0.066
+
 # WebSocket connection manager
 class ConnectionManager:
     def __init__(self):
         self.active_connections: Dict[str, WebSocket] = {}
+        self.outboxes: Dict[str, asyncio.Queue] = {}
+        self.writer_tasks: Dict[str, asyncio.Task] = {}
+        self.last_pose: Dict[str, tuple] = {}  # session_id -> (timestamp, result)
+        self.pose_gates: Dict[str, asyncio.Semaphore] = {}
 
-    async def connect(self, websocket: WebSocket, session_id: str):
+    async def connect(self, websocket: WebSocket, session_id: str) -> bool:
+        if len(self.active_connections) >= settings.MAX_CONCURRENT_CONNECTIONS:
+            # 1013 = Try Again Later
+            await websocket.close(code=1013)
+            return False
         await websocket.accept()
         self.active_connections[session_id] = websocket
-        logger.info(f"WebSocket connected: {session_id}")
+        self.outboxes[session_id] = asyncio.Queue()
+        # At most one in-flight pose inference per session
+        self.pose_gates[session_id] = asyncio.Semaphore(1)
+        self.writer_tasks[session_id] = asyncio.create_task(
+            self._write_outbox(session_id, websocket)
+        )
+        logger.debug("WebSocket connected: %s", session_id)
+        return True
 
     def disconnect(self, session_id: str):
         if session_id in self.active_connections:
             del self.active_connections[session_id]
-            logger.info(f"WebSocket disconnected: {session_id}")
+            self.outboxes.pop(session_id, None)
+            self.last_pose.pop(session_id, None)
+            self.pose_gates.pop(session_id, None)
+            writer = self.writer_tasks.pop(session_id, None)
+            if writer:
+                writer.cancel()
+            logger.debug("WebSocket disconnected: %s", session_id)
+
+    async def _write_outbox(self, session_id: str, websocket: WebSocket):
+        """Drain a session's outbox, batching close-together messages into one frame"""
+        queue = self.outboxes[session_id]
+        try:
+            while True:
+                messages = [await queue.get()]
+                # Coalesce anything else produced within the flush window
+                while True:
+                    try:
+                        messages.append(await asyncio.wait_for(queue.get(), FLUSH_WINDOW))
+                    except asyncio.TimeoutError:
+                        break
+                await websocket.send_bytes(enc.encode(messages))
+        except (WebSocketDisconnect, asyncio.CancelledError):
+            pass
+        except Exception:
+            logger.exception("Outbox writer error for %s", session_id)
 
     async def send_personal_message(self, message: dict, session_id: str):
-        if session_id in self.active_connections:
-            await self.active_connections[session_id].send_text(json.dumps(message))
+        if session_id in self.outboxes:
+            self.outboxes[session_id].put_nowait(message)
+
+    async def broadcast(self, message: dict):
+        """Push one message to every session, encoding the payload only once"""
+        # Single-element batch so it matches the coalesced outbox framing
+        payload = enc.encode([message])
+        await asyncio.gather(
+            *(ws.send_bytes(payload) for ws in self.active_connections.values()),
+            return_exceptions=True  # a closed socket shouldn't fail the rest
+        )
 
 manager = ConnectionManager()
 
 @app.websocket("/ws/yoga/{session_id}")
 async def yoga_websocket(websocket: WebSocket, session_id: str):
-    await manager.connect(websocket, session_id)
+    if not await manager.connect(websocket, session_id):
+        return
     try:
         while True:
-            data = await websocket.receive_text()
-            message = json.loads(data)
-            
-            if message['type'] == 'pose_frame':
-                # Process pose with MediaPipe
-                pose_result = await mediapipe_service.process_frame(message['data'])
+            data = await websocket.receive_bytes()
+            message = dec.decode(data)
+
+            if isinstance(message, PoseFrame):
+                # Throttle to ~15 fps: replay the cached result for frames
+                # arriving faster than POSE_MIN_INTERVAL
+                now = time.monotonic()
+                cached = manager.last_pose.get(session_id)
+                if cached and now - cached[0] < POSE_MIN_INTERVAL:
+                    pose_result = cached[1]
+                else:
+                    # One in-flight inference per session; a stale frame is
+                    # worthless in real time, so drop instead of queueing
+                    gate = manager.pose_gates[session_id]
+                    if gate.locked():
+                        logger.debug("Dropping pose frame for %s: inference in flight", session_id)
+                        continue
+                    async with gate:
+                        # Process pose with MediaPipe
+                        pose_result = await mediapipe_service.process_frame(message.data['image'])
+                    manager.last_pose[session_id] = (now, pose_result)
                 await manager.send_personal_message({
                     "type": "pose_correction",
                     "data": pose_result
                 }, session_id)
-            
-            elif message['type'] == 'chat_message':
-                # Process with Ollama locally
-                response = await ollama_service.generate_response(
-                    prompt=message['content'],
+
+            elif isinstance(message, ChatMessage):
+                # Stream tokens from Ollama so the client renders the reply
+                # as it is generated instead of waiting for the full text
+                async for token in ollama_service.generate_response_stream(
+                    prompt=message.content,
                     context="yoga_instruction"
-                )
+                ):
+                    await manager.send_personal_message({
+                        "type": "chat_response_chunk",
+                        "data": token
+                    }, session_id)
                 await manager.send_personal_message({
-                    "type": "chat_response",
-                    "data": response
+                    "type": "chat_response_done",
+                    "data": None
                 }, session_id)
-            
-            elif message['type'] == 'consciousness_data':
+
+            elif isinstance(message, ConsciousnessData):
                 # Process consciousness data
-                consciousness_result = await consciousness_service.analyze_consciousness(message['data'])
+                consciousness_result = await consciousness_service.analyze_consciousness(message.data)
                 await manager.send_personal_message({
                     "type": "consciousness_analysis",
                     "data": consciousness_result
@@ -92,8 +184,8 @@ async def yoga_websocket(websocket: WebSocket, session_id: str):
                 
     except WebSocketDisconnect:
         manager.disconnect(session_id)
-    except Exception as e:
-        logger.error(f"WebSocket error: {e}")
+    except Exception:
+        logger.exception("WebSocket error")
         manager.disconnect(session_id)
 
 @app.get("/health")
@@ -113,4 +205,8 @@ async def startup_event():
     logger.info("All services initialized successfully")
 
 if __name__ == "__main__":
-    uvicorn.run(app, host="0.0.0.0", port=8000, log_level="info")
+    # permessage-deflate needs the websockets backend; landmark blobs and
+    # msgpack maps compress well even though the JPEG payload itself doesn't
+    uvicorn.run(app, host="0.0.0.0", port=8000, log_level="info",
+                loop="uvloop", http="httptools",
+                ws="websockets", ws_per_message_deflate=True)
@@ -0,0 +1,51 @@
+import numpy as np
+
+# Numba-compiled numeric kernels for the per-frame hot paths. cache=True
+# persists the compiled code, so only the first ever run pays compile cost;
+# services warm these in initialize() to keep it off the first request.
+try:
+    from numba import njit
+except ImportError:  # numba is optional - fall back to the plain functions
+    def njit(*args, **kwargs):
+        def wrap(func):
+            return func
+        if args and callable(args[0]):
+            return args[0]
+        return wrap
+
+@njit(cache=True, fastmath=True)
+def joint_angles_batch(coords: np.ndarray, idx: np.ndarray) -> np.ndarray:
+    """Angle in degrees at each (A, vertex, C) landmark triplet in idx
+
+    coords is the (N, 2) landmark coordinate array; idx is (M, 3) rows of
+    landmark indices. Returns an (M,) array of angles.
+    """
+    out = np.empty(idx.shape[0], dtype=np.float64)
+    for i in range(idx.shape[0]):
+        a = coords[idx[i, 0]]
+        b = coords[idx[i, 1]]
+        c = coords[idx[i, 2]]
+
+        bax = a[0] - b[0]
+        bay = a[1] - b[1]
+        bcx = c[0] - b[0]
+        bcy = c[1] - b[1]
+
+        denom = np.sqrt(bax * bax + bay * bay) * np.sqrt(bcx * bcx + bcy * bcy)
+        cosine = (bax * bcx + bay * bcy) / denom
+        if cosine > 1.0:
+            cosine = 1.0
+        elif cosine < -1.0:
+            cosine = -1.0
+        out[i] = np.degrees(np.arccos(cosine))
+    return out
+
+@njit(cache=True)
+def pci(alpha: float, theta: float, beta: float, gamma: float) -> float:
+    """Simplified Perturbational Complexity Index, clamped to 0-1"""
+    value = (alpha * 0.4 + theta * 0.3 + gamma * 0.2 - beta * 0.1) / 100.0
+    if value < 0.0:
+        return 0.0
+    if value > 1.0:
+        return 1.0
+    return value
@@ -1,20 +1,42 @@
 import cv2
 import numpy as np
 import mediapipe as mp
-import base64
 import asyncio
+import concurrent.futures
+import os
 import logging
 from typing import Dict, List, Optional, Tuple
 from core.config import settings
+from services.ai._kernels import joint_angles_batch
 
 logger = logging.getLogger(__name__)
 
+# Landmark index triplets (point A, vertex, point C) for each tracked joint,
+# in a fixed order shared by every per-joint array in this module
+_JOINT_NAMES = ("left_elbow", "right_elbow", "left_knee", "right_knee")
+_JOINT_IDX = np.array([
+    [11, 13, 15],  # left shoulder-elbow-wrist
+    [12, 14, 16],  # right shoulder-elbow-wrist
+    [23, 25, 27],  # left hip-knee-ankle
+    [24, 26, 28],  # right hip-knee-ankle
+])
+
+# Longest image side fed to MediaPipe; inference cost scales with pixel
+# count and a single-person yoga scene gains no accuracy beyond this
+_MAX_SIDE = 512
+
+def _bucket(angle: float) -> int:
+    """Quantize a joint angle: 0 = bent (<60), 1 = slight, 2 = straight (>=150)"""
+    return 0 if angle < 60 else 1 if angle < 150 else 2
+
 class MediaPipeService:
     def __init__(self):
         self.mp_pose = mp.solutions.pose
         self.mp_drawing = mp.solutions.drawing_utils
         self.pose = None
         self.is_ready_flag = False
+        self._executor = None
+        self._decode_gate = None
         
         # Yoga poses reference angles (simplified)
         self.pose_references = {
@@ -25,6 +47,22 @@ class MediaPipeService:
             "plank": {"left_elbow": 180, "right_elbow": 180, "left_knee": 180, "right_knee": 180}
         }
 
+        # Reference angles as (4,) arrays aligned with _JOINT_NAMES, so
+        # quality scoring and corrections are single vector ops per frame
+        self._pose_ref_arr = {
+            name: np.array([ref[joint] for joint in _JOINT_NAMES], dtype=np.float32)
+            for name, ref in self.pose_references.items()
+        }
+
+        # Decision table keyed by the packed 2-bit joint buckets (order:
+        # _JOINT_NAMES); first pose wins when references share a key
+        self._pose_lut = {}
+        for name, ref in self.pose_references.items():
+            key = 0
+            for shift, joint in enumerate(_JOINT_NAMES):
+                key |= _bucket(ref[joint]) << (2 * shift)
+            self._pose_lut.setdefault(key, name)
+
     async def initialize(self):
         """Initialize MediaPipe Pose"""
         try:
@@ -35,51 +73,92 @@ class MediaPipeService:
                 min_detection_confidence=settings.MEDIAPIPE_MIN_DETECTION_CONFIDENCE,
                 min_tracking_confidence=settings.MEDIAPIPE_MIN_TRACKING_CONFIDENCE
             )
+            # MediaPipe releases the GIL during native inference, so a small
+            # thread pool keeps the asyncio loop free for other sessions
+            self._executor = concurrent.futures.ThreadPoolExecutor(
+                max_workers=min(4, os.cpu_count() or 1)
+            )
+            # Bound in-flight decode+inference jobs so a load spike queues
+            # frames instead of ballooning decoded-image memory
+            self._decode_gate = asyncio.Semaphore(4)
+            # Warm the JIT so the first real frame doesn't pay compile
+            # latency; the strided column view matches the layout of the
+            # landmarks[:, :2] slice passed at runtime (a C-contiguous
+            # array would compile a different numba signature)
+            joint_angles_batch(np.zeros((33, 4), dtype=np.float32)[:, :2], _JOINT_IDX)
             self.is_ready_flag = True
             logger.info("MediaPipe Pose initialized successfully")
         except Exception as e:
-            logger.error(f"Failed to initialize MediaPipe: {e}")
+            logger.error("Failed to initialize MediaPipe: %s", e)
             raise
 
     def is_ready(self) -> bool:
         return self.is_ready_flag
 
-    async def process_frame(self, frame_data: str) -> Dict:
+    def _decode_and_infer(self, frame_data: bytes):
+        """Decode JPEG bytes and run MediaPipe inference (blocking, runs in executor)"""
+        # Raw JPEG bytes straight off the wire - zero-copy view
+        nparr = np.frombuffer(frame_data, np.uint8)
+        image = cv2.imdecode(nparr, cv2.IMREAD_COLOR)
+
+        if image is None:
+            return None
+
+        # Downscale oversized frames before inference
+        h, w = image.shape[:2]
+        scale = _MAX_SIDE / max(h, w)
+        if scale < 1:
+            image = cv2.resize(image, (int(w * scale), int(h * scale)),
+                               interpolation=cv2.INTER_AREA)
+
+        # Convert BGR to RGB in place - avoids a full-frame copy per frame
+        cv2.cvtColor(image, cv2.COLOR_BGR2RGB, dst=image)
+
+        # Marking the buffer read-only lets MediaPipe skip its defensive copy
+        image.flags.writeable = False
+
+        # Process with MediaPipe
+        return self.pose.process(image)
+
+    async def process_frame(self, frame_data: bytes) -> Dict:
         """Process video frame for pose detection"""
         try:
-            # Decode base64 image
-            image_data = base64.b64decode(frame_data.split(',')[1])
-            nparr = np.frombuffer(image_data, np.uint8)
-            image = cv2.imdecode(nparr, cv2.IMREAD_COLOR)
-            
-            if image is None:
+            # Offload the CPU-bound decode + inference so the event loop
+            # stays responsive for other WebSocket sessions
+            async with self._decode_gate:
+                results = await asyncio.get_running_loop().run_in_executor(
+                    self._executor, self._decode_and_infer, frame_data
+                )
+
+            if results is None:
                 return {"error": "Invalid image data"}
-            
-            # Convert BGR to RGB
-            rgb_image = cv2.cvtColor(image, cv2.COLOR_BGR2RGB)
-            
-            # Process with MediaPipe
-            results = self.pose.process(rgb_image)
-            
+
             if results.pose_landmarks:
                 # Extract landmarks
                 landmarks = self._extract_landmarks(results.pose_landmarks)
-                
+
                 # Calculate joint angles
-                joint_angles = self._calculate_joint_angles(landmarks)
-                
-                # Detect pose type
-                detected_pose = self._classify_pose(joint_angles)
-                
+                joint_angles, angles_arr = self._calculate_joint_angles(landmarks[:, :2])
+
+                # Detect pose type via the quantized decision table
+                key = self._quantize_key(angles_arr)
+                detected_pose = self._classify_pose(key)
+
                 # Generate corrections
-                corrections = self._generate_corrections(joint_angles, detected_pose)
-                
+                corrections = self._generate_corrections(angles_arr, detected_pose)
+
                 # Calculate pose quality score
-                quality_score = self._calculate_pose_quality(joint_angles, detected_pose)
+                quality_score = self._calculate_pose_quality(angles_arr, detected_pose)
                 
                 return {
                     "pose_detected": True,
-                    "landmarks": landmarks,
+                    # Packed binary blob (528 bytes) instead of 33 dicts -
+                    # msgpack ships it as a bin, the client views it as Float32Array
+                    "landmarks": {
+                        "buffer": landmarks.tobytes(),
+                        "shape": list(landmarks.shape),
+                        "dtype": "float32"
+                    },
                     "joint_angles": joint_angles,
                     "detected_pose": detected_pose,
                     "corrections": corrections,
@@ -93,140 +172,77 @@ class MediaPipeService:
                 }
                 
         except Exception as e:
-            logger.error(f"Frame processing error: {e}")
+            logger.exception("Frame processing failed")
             return {"error": f"Processing failed: {str(e)}"}
 
-    def _extract_landmarks(self, pose_landmarks) -> List[Dict]:
-        """Extract pose landmarks as list of dictionaries"""
-        landmarks = []
-        for idx, landmark in enumerate(pose_landmarks.landmark):
-            landmarks.append({
-                "id": idx,
-                "x": landmark.x,
-                "y": landmark.y,
-                "z": landmark.z,
-                "visibility": landmark.visibility
-            })
-        return landmarks
-
-    def _calculate_joint_angles(self, landmarks: List[Dict]) -> Dict:
-        """Calculate key joint angles"""
+    def _extract_landmarks(self, pose_landmarks) -> np.ndarray:
+        """Extract pose landmarks as an (N, 4) float32 array of x, y, z, visibility"""
+        landmark_list = pose_landmarks.landmark
+        arr = np.empty((len(landmark_list), 4), dtype=np.float32)
+        for i, lm in enumerate(landmark_list):
+            arr[i] = (lm.x, lm.y, lm.z, lm.visibility)
+        return arr
+
+    def _calculate_joint_angles(self, coords: np.ndarray) -> Tuple[Dict, Optional[np.ndarray]]:
+        """Calculate key joint angles from the (N, 2) landmark coordinate array
+
+        Returns both a name->angle dict (for the wire payload) and the raw
+        (4,) array in _JOINT_NAMES order for vectorized scoring.
+        """
         try:
-            angles = {}
-            
-            # Left elbow angle
-            if len(landmarks) > 15:
-                left_shoulder = np.array([landmarks[11]['x'], landmarks[11]['y']])
-                left_elbow = np.array([landmarks[13]['x'], landmarks[13]['y']])
-                left_wrist = np.array([landmarks[15]['x'], landmarks[15]['y']])
-                angles['left_elbow'] = self._calculate_angle(left_shoulder, left_elbow, left_wrist)
-            
-            # Right elbow angle
-            if len(landmarks) > 16:
-                right_shoulder = np.array([landmarks[12]['x'], landmarks[12]['y']])
-                right_elbow = np.array([landmarks[14]['x'], landmarks[14]['y']])
-                right_wrist = np.array([landmarks[16]['x'], landmarks[16]['y']])
-                angles['right_elbow'] = self._calculate_angle(right_shoulder, right_elbow, right_wrist)
-            
-            # Left knee angle
-            if len(landmarks) > 27:
-                left_hip = np.array([landmarks[23]['x'], landmarks[23]['y']])
-                left_knee = np.array([landmarks[25]['x'], landmarks[25]['y']])
-                left_ankle = np.array([landmarks[27]['x'], landmarks[27]['y']])
-                angles['left_knee'] = self._calculate_angle(left_hip, left_knee, left_ankle)
-            
-            # Right knee angle
-            if len(landmarks) > 28:
-                right_hip = np.array([landmarks[24]['x'], landmarks[24]['y']])
-                right_knee = np.array([landmarks[26]['x'], landmarks[26]['y']])
-                right_ankle = np.array([landmarks[28]['x'], landmarks[28]['y']])
-                angles['right_knee'] = self._calculate_angle(right_hip, right_knee, right_ankle)
-            
-            return angles
-            
+            if coords.shape[0] <= _JOINT_IDX.max():
+                return {}, None
+
+            angles = joint_angles_batch(coords, _JOINT_IDX)
+
+            return dict(zip(_JOINT_NAMES, (float(a) for a in angles))), angles
+
         except Exception as e:
-            logger.error(f"Angle calculation error: {e}")
-            return {}
+            logger.error("Angle calculation error: %s", e)
+            return {}, None
 
-    def _calculate_angle(self, a: np.ndarray, b: np.ndarray, c: np.ndarray) -> float:
-        """Calculate angle between three points"""
-        try:
-            ba = a - b
-            bc = c - b
-            
-            cosine_angle = np.dot(ba, bc) / (np.linalg.norm(ba) * np.linalg.norm(bc))
-            cosine_angle = np.clip(cosine_angle, -1.0, 1.0)
-            angle = np.arccos(cosine_angle)
-            
-            return np.degrees(angle)
-        except:
-            return 0.0
-
-    def _classify_pose(self, joint_angles: Dict) -> str:
-        """Classify the detected pose"""
-        if not joint_angles:
+    def _quantize_key(self, angles_arr: Optional[np.ndarray]) -> Optional[int]:
+        """Pack the four joint angles into an 8-bit bucket key"""
+        if angles_arr is None:
+            return None
+        return (_bucket(angles_arr[0])
+                | _bucket(angles_arr[1]) << 2
+                | _bucket(angles_arr[2]) << 4
+                | _bucket(angles_arr[3]) << 6)
+
+    def _classify_pose(self, key: Optional[int]) -> str:
+        """Classify the detected pose from its quantized angle key"""
+        if key is None:
             return "unknown"
-        
-        # Simple pose classification based on joint angles
-        left_knee = joint_angles.get('left_knee', 180)
-        right_knee = joint_angles.get('right_knee', 180)
-        left_elbow = joint_angles.get('left_elbow', 180)
-        right_elbow = joint_angles.get('right_elbow', 180)
-        
-        # Basic pose detection logic
-        if abs(left_knee - 90) < 20 and abs(right_knee - 180) < 20:
-            return "warrior_1"
-        elif abs(left_knee - 90) < 30 and abs(right_knee - 180) < 20:
-            return "tree"
-        elif abs(left_elbow - 180) < 20 and abs(right_elbow - 180) < 20:
-            if abs(left_knee - 180) < 20 and abs(right_knee - 180) < 20:
-                return "mountain"
-        
-        return "general_pose"
+        return self._pose_lut.get(key, "general_pose")
 
-    def _generate_corrections(self, joint_angles: Dict, pose_type: str) -> List[str]:
+    def _generate_corrections(self, angles_arr: Optional[np.ndarray], pose_type: str) -> List[str]:
         """Generate pose corrections"""
         corrections = []
-        
-        if pose_type in self.pose_references:
-            reference = self.pose_references[pose_type]
-            
-            for joint, current_angle in joint_angles.items():
-                if joint in reference:
-                    target_angle = reference[joint]
-                    difference = abs(current_angle - target_angle)
-                    
-                    if difference > 15:  # Threshold for correction
-                        if current_angle > target_angle:
-                            corrections.append(f"Decrease {joint.replace('_', ' ')} angle by {difference:.1f} degrees")
-                        else:
-                            corrections.append(f"Increase {joint.replace('_', ' ')} angle by {difference:.1f} degrees")
-        
+
+        if angles_arr is not None and pose_type in self._pose_ref_arr:
+            # One vectorized diff; Python only formats the messages
+            diff = angles_arr - self._pose_ref_arr[pose_type]
+
+            for joint, difference in zip(_JOINT_NAMES, diff):
+                magnitude = abs(float(difference))
+                if magnitude > 15:  # Threshold for correction
+                    if difference > 0:
+                        corrections.append(f"Decrease {joint.replace('_', ' ')} angle by {magnitude:.1f} degrees")
+                    else:
+                        corrections.append(f"Increase {joint.replace('_', ' ')} angle by {magnitude:.1f} degrees")
+
         if not corrections:
             corrections.append("Great form! Keep holding the pose.")
-        
+
         return corrections
 
-    def _calculate_pose_quality(self, joint_angles: Dict, pose_type: str) -> float:
+    def _calculate_pose_quality(self, angles_arr: Optional[np.ndarray], pose_type: str) -> float:
         """Calculate pose quality score (0-100)"""
-        if pose_type not in self.pose_references or not joint_angles:
-            return 50.0
-        
-        reference = self.pose_references[pose_type]
-        total_error = 0
-        joint_count = 0
-        
-        for joint, current_angle in joint_angles.items():
-            if joint in reference:
-                target_angle = reference[joint]
-                error = abs(current_angle - target_angle) / 180.0  # Normalize to 0-1
-                total_error += error
-                joint_count += 1
-        
-        if joint_count == 0:
+        if angles_arr is None or pose_type not in self._pose_ref_arr:
             return 50.0
-        
-        average_error = total_error / joint_count
+
+        average_error = float(np.abs(angles_arr - self._pose_ref_arr[pose_type]).mean()) / 180.0
         quality_score = max(0, 100 - (average_error * 100))
-        
+
         return round(quality_score, 1)
@@ -1,96 +1,248 @@
 import aiohttp
 import asyncio
-import json
+import hashlib
+import orjson
 import logging
-from typing import Dict, Optional, Any
+import time
+import numpy as np
+from typing import Dict, List, Optional, Any
 from core.config import settings
 
 logger = logging.getLogger(__name__)
 
+_JSON_HEADERS = {"Content-Type": "application/json"}
+
+# How long a health check result stays valid before re-probing Ollama
+_HEALTH_TTL = 30.0
+
+_YOGA_CONTEXT = """You are an expert yoga instructor and wellness coach.
+            Provide helpful, accurate, and safe yoga guidance. Focus on:
+            - Proper alignment and technique
+            - Safety considerations and modifications
+            - Breathing techniques (pranayama)
+            - Mindfulness and meditation guidance
+            - Beginner-friendly explanations
+
+            Always prioritize safety and encourage users to listen to their bodies."""
+
+# Invariant part of the /api/generate payload; per-request fields are merged
+# in. The instructor context rides in "system" so Ollama's prefix KV cache
+# reuses its attention states across requests instead of re-prefilling it.
+_PAYLOAD_TEMPLATE = {
+    "system": _YOGA_CONTEXT,
+    "stream": False,
+    "keep_alive": "15m",
+    "options": {
+        "temperature": 0.7,
+        "top_p": 0.9,
+        "max_tokens": 500,
+        "num_thread": 4
+    }
+}
+
+class SemanticCache:
+    """Two-tier cache for generated responses.
+
+    Tier 1 is an exact sha256(prompt + context) lookup; tier 2 matches by
+    cosine similarity over L2-normalized prompt embeddings, so near-duplicate
+    prompts (the templated sequence/breathing requests) hit without a
+    generation round trip.
+    """
+
+    def __init__(self, similarity_threshold: float = 0.85, max_entries: int = 256):
+        self.similarity_threshold = similarity_threshold
+        self.max_entries = max_entries
+        self._exact: Dict[str, str] = {}
+        self._embeddings: Optional[np.ndarray] = None  # (N, D), rows normalized
+        self._responses: List[str] = []
+
+    @staticmethod
+    def _key(prompt: str, context: str) -> str:
+        return hashlib.sha256(f"{prompt}\x00{context}".encode()).hexdigest()
+
+    def get_exact(self, prompt: str, context: str) -> Optional[str]:
+        return self._exact.get(self._key(prompt, context))
+
+    def get_similar(self, embedding: Optional[np.ndarray]) -> Optional[str]:
+        if embedding is None or self._embeddings is None:
+            return None
+        sims = self._embeddings @ (embedding / np.linalg.norm(embedding))
+        best = int(sims.argmax())
+        if sims[best] >= self.similarity_threshold:
+            return self._responses[best]
+        return None
+
+    def put(self, prompt: str, context: str, embedding: Optional[np.ndarray], response: str):
+        if len(self._exact) >= self.max_entries:
+            return  # full - stop growing rather than churning hot entries
+        self._exact[self._key(prompt, context)] = response
+        if embedding is not None:
+            row = (embedding / np.linalg.norm(embedding)).astype(np.float32)
+            if self._embeddings is None:
+                self._embeddings = row[np.newaxis, :]
+            else:
+                self._embeddings = np.vstack([self._embeddings, row])
+            self._responses.append(response)
+
 class OllamaService:
     def __init__(self):
         self.host = settings.OLLAMA_HOST
         self.model = settings.OLLAMA_MODEL
         self.session: Optional[aiohttp.ClientSession] = None
         self.is_initialized = False
+        self._cache = SemanticCache()
+        self._session_lock = asyncio.Lock()
+        self._healthy = False
+        self._health_expires_at = 0.0
+        self._health_lock = asyncio.Lock()
         
+    async def _ensure_session(self) -> aiohttp.ClientSession:
+        """Create the shared HTTP session exactly once (double-checked lock)"""
+        if self.session is None:
+            async with self._session_lock:
+                if self.session is None:
+                    # One keep-alive pool to Ollama - avoids per-request TCP
+                    # handshakes and repeated DNS lookups
+                    self.session = aiohttp.ClientSession(
+                        connector=aiohttp.TCPConnector(
+                            limit=100,
+                            limit_per_host=32,
+                            keepalive_timeout=75,
+                            ttl_dns_cache=300
+                        ),
+                        timeout=aiohttp.ClientTimeout(total=30, connect=2),
+                        json_serialize=lambda obj: orjson.dumps(obj).decode()
+                    )
+        return self.session
+
     async def initialize(self):
         """Initialize the Ollama service"""
         try:
-            self.session = aiohttp.ClientSession()
+            await self._ensure_session()
             # Test connection
             await self.health_check()
             self.is_initialized = True
-            logger.info(f"Ollama service initialized with model: {self.model}")
+            logger.info("Ollama service initialized with model: %s", self.model)
         except Exception as e:
-            logger.error(f"Failed to initialize Ollama service: {e}")
+            logger.error("Failed to initialize Ollama service: %s", e)
             raise
 
     async def health_check(self) -> bool:
-        """Check if Ollama service is available"""
+        """Check if Ollama service is available (result cached for 30 s)"""
+        if time.monotonic() < self._health_expires_at:
+            return self._healthy
+
+        async with self._health_lock:
+            # Another coroutine may have refreshed while we waited
+            if time.monotonic() < self._health_expires_at:
+                return self._healthy
+
+            try:
+                session = await self._ensure_session()
+
+                async with session.get(f"{self.host}/api/tags") as response:
+                    if response.status == 200:
+                        data = orjson.loads(await response.read())
+                        self._healthy = any(
+                            model['name'] == self.model
+                            for model in data.get('models', [])
+                        )
+                    else:
+                        self._healthy = False
+            except Exception as e:
+                logger.error("Ollama health check failed: %s", e)
+                self._healthy = False
+
+            self._health_expires_at = time.monotonic() + _HEALTH_TTL
+            return self._healthy
+
+    async def _embed(self, text: str) -> Optional[np.ndarray]:
+        """Embed text via Ollama's embeddings endpoint; None on any failure"""
         try:
-            if not self.session:
-                self.session = aiohttp.ClientSession()
-            
-            async with self.session.get(f"{self.host}/api/tags") as response:
+            async with self.session.post(
+                f"{self.host}/api/embeddings",
+                data=orjson.dumps({"model": self.model, "prompt": text}),
+                headers=_JSON_HEADERS,
+                timeout=aiohttp.ClientTimeout(total=5)
+            ) as response:
                 if response.status == 200:
-                    data = await response.json()
-                    models = [model['name'] for model in data.get('models', [])]
-                    return self.model in models
-                return False
+                    data = orjson.loads(await response.read())
+                    embedding = data.get("embedding")
+                    if embedding:
+                        return np.asarray(embedding, dtype=np.float32)
         except Exception as e:
-            logger.error(f"Ollama health check failed: {e}")
-            return False
+            logger.error("Embedding request failed: %s", e)
+        return None
 
-    async def generate_response(self, prompt: str, context: str = "") -> str:
-        """Generate response using Ollama"""
+    async def generate_response_stream(self, prompt: str, context: str = ""):
+        """Stream response tokens from Ollama as they are generated
+
+        Cache hits yield the full cached text as a single chunk; otherwise
+        tokens arrive as Ollama produces them (time-to-first-token instead
+        of time-to-full-response) and the joined text is cached at the end.
+        """
         if not self.is_initialized:
             await self.initialize()
-            
+
+        # Semantic cache: exact hit first, then cosine similarity over
+        # prompt embeddings - a hit skips the multi-second generation
+        cached = self._cache.get_exact(prompt, context)
+        if cached is not None:
+            yield cached
+            return
+
+        embedding = await self._embed(prompt)
+        cached = self._cache.get_similar(embedding)
+        if cached is not None:
+            yield cached
+            return
+
         try:
-            yoga_context = """You are an expert yoga instructor and wellness coach. 
-            Provide helpful, accurate, and safe yoga guidance. Focus on:
-            - Proper alignment and technique
-            - Safety considerations and modifications
-            - Breathing techniques (pranayama)
-            - Mindfulness and meditation guidance
-            - Beginner-friendly explanations
-            
-            Always prioritize safety and encourage users to listen to their bodies."""
-            
-            full_prompt = f"{yoga_context}\n\nContext: {context}\n\nUser: {prompt}\n\nYoga Instructor:"
-            
-            payload = {
-                "model": self.model,
-                "prompt": full_prompt,
-                "stream": False,
-                "keep_alive": "15m",
-                "options": {
-                    "temperature": 0.7,
-                    "top_p": 0.9,
-                    "max_tokens": 500,
-                    "num_thread": 4
-                }
-            }
-            
+            full_prompt = f"Context: {context}\n\nUser: {prompt}\n\nYoga Instructor:"
+
+            payload = {**_PAYLOAD_TEMPLATE, "model": self.model,
+                       "prompt": full_prompt, "stream": True}
+
+            pieces = []
             async with self.session.post(
                 f"{self.host}/api/generate",
-                json=payload,
+                data=orjson.dumps(payload),
+                headers=_JSON_HEADERS,
                 timeout=aiohttp.ClientTimeout(total=30)
             ) as response:
-                if response.status == 200:
-                    data = await response.json()
-                    return data.get('response', 'I apologize, but I cannot provide a response right now.')
-                else:
-                    logger.error(f"Ollama API error: {response.status}")
-                    return "I'm having trouble connecting to the AI service. Please try again."
-                    
+                if response.status != 200:
+                    logger.error("Ollama API error: %s", response.status)
+                    yield "I'm having trouble connecting to the AI service. Please try again."
+                    return
+
+                # Ollama streams newline-delimited JSON objects
+                async for line in response.content:
+                    if not line.strip():
+                        continue
+                    chunk = orjson.loads(line)
+                    token = chunk.get('response')
+                    if token:
+                        pieces.append(token)
+                        yield token
+                    if chunk.get('done'):
+                        break
+
+            if pieces:
+                self._cache.put(prompt, context, embedding, "".join(pieces))
+
         except asyncio.TimeoutError:
             logger.error("Ollama request timeout")
-            return "The AI service is taking too long to respond. Please try again."
+            yield "The AI service is taking too long to respond. Please try again."
         except Exception as e:
-            logger.error(f"Ollama generation error: {e}")
-            return "I'm experiencing technical difficulties. Please try again later."
+            logger.error("Ollama generation error: %s", e)
+            yield "I'm experiencing technical difficulties. Please try again later."
+
+    async def generate_response(self, prompt: str, context: str = "") -> str:
+        """Generate a complete response (joins the streaming path)"""
+        pieces = [chunk async for chunk in self.generate_response_stream(prompt, context)]
+        if pieces:
+            return "".join(pieces)
+        return 'I apologize, but I cannot provide a response right now.'
 
     async def generate_yoga_sequence(self, user_profile: Dict[str, Any]) -> Dict[str, Any]:
         """Generate personalized yoga sequence"""
@@ -8,6 +8,7 @@ class QCYISApp {
         this.stream = null;
         this.isDetecting = false;
         this.animationId = null;
+        this.activeAssistantMessage = null;
         
         // UI Elements
         this.elements = {
@@ -63,15 +64,19 @@ class QCYISApp {
         
         try {
             this.ws = new WebSocket(wsUrl);
-            
+            this.ws.binaryType = 'arraybuffer';
+
             this.ws.onopen = () => {
                 console.log('WebSocket connected');
                 this.updateConnectionStatus(true);
             };
 
             this.ws.onmessage = (event) => {
-                const message = JSON.parse(event.data);
-                this.handleWebSocketMessage(message);
+                // The server batches messages produced close in time into one frame
+                const batch = MessagePack.decode(new Uint8Array(event.data));
+                for (const message of batch) {
+                    this.handleWebSocketMessage(message);
+                }
             };
 
             this.ws.onclose = () => {
@@ -172,14 +177,20 @@ class QCYISApp {
         if (!this.isDetecting) return;
 
         this.ctx.drawImage(this.videoElement, 0, 0, this.poseCanvas.width, this.poseCanvas.height);
-        const frameData = this.poseCanvas.toDataURL('image/jpeg', 0.8);
 
-        if (this.ws && this.ws.readyState === WebSocket.OPEN) {
-            this.ws.send(JSON.stringify({
-                type: 'pose_frame',
-                data: frameData
-            }));
-        }
+        // Ship raw JPEG bytes in a binary msgpack frame - no base64 inflation
+        this.poseCanvas.toBlob((blob) => {
+            if (blob && this.ws && this.ws.readyState === WebSocket.OPEN) {
+                blob.arrayBuffer().then((buffer) => {
+                    if (this.ws && this.ws.readyState === WebSocket.OPEN) {
+                        this.ws.send(MessagePack.encode({
+                            type: 'pose_frame',
+                            data: { image: new Uint8Array(buffer) }
+                        }));
+                    }
+                });
+            }
+        }, 'image/jpeg', 0.8);
 
         this.animationId = requestAnimationFrame(() => this.processVideoFrame());
     }
@@ -196,6 +207,12 @@ class QCYISApp {
             case 'chat_response':
                 this.addChatMessage('assistant', message.data);
                 break;
+            case 'chat_response_chunk':
+                this.appendAssistantChunk(message.data);
+                break;
+            case 'chat_response_done':
+                this.activeAssistantMessage = null;
+                break;
             case 'consciousness_analysis':
                 this.updateConsciousnessData(message.data);
                 break;
@@ -225,15 +242,21 @@ class QCYISApp {
         this.ctx.strokeStyle = '#00ffff';
         this.ctx.lineWidth = 2;
 
-        landmarks.forEach(point => {
-            const x = point.x * this.poseCanvas.width;
-            const y = point.y * this.poseCanvas.height;
+        // Landmarks arrive as a packed (N, 4) float32 blob: x, y, z, visibility.
+        // Copy via slice() so the Float32Array view is 4-byte aligned.
+        const bytes = landmarks.buffer.slice();
+        const points = new Float32Array(bytes.buffer, 0, bytes.byteLength / 4);
+        const stride = landmarks.shape[1];
+
+        for (let i = 0; i < points.length; i += stride) {
+            const x = points[i] * this.poseCanvas.width;
+            const y = points[i + 1] * this.poseCanvas.height;
             this.ctx.beginPath();
             this.ctx.arc(x, y, 5, 0, 2 * Math.PI);
             this.ctx.fillStyle = '#ff00ff';
             this.ctx.fill();
             this.ctx.stroke();
-        });
+        }
     }
 
     updateCorrections(corrections) {
@@ -295,13 +318,33 @@ class QCYISApp {
         this.elements.chatInput.value = '';
 
         if (this.ws && this.ws.readyState === WebSocket.OPEN) {
-            this.ws.send(JSON.stringify({
+            this.ws.send(MessagePack.encode({
                 type: 'chat_message',
                 content: message
             }));
         }
     }
 
+    appendAssistantChunk(text) {
+        // Streamed tokens accumulate into one assistant bubble until the
+        // server sends chat_response_done
+        if (!this.activeAssistantMessage) {
+            const container = this.elements.chatMessages;
+            const messageDiv = document.createElement('div');
+            messageDiv.className = 'message assistant-message';
+
+            const contentDiv = document.createElement('div');
+            contentDiv.className = 'message-content';
+
+            messageDiv.appendChild(contentDiv);
+            container.appendChild(messageDiv);
+            this.activeAssistantMessage = contentDiv;
+        }
+
+        this.activeAssistantMessage.textContent += text;
+        this.elements.chatMessages.scrollTop = this.elements.chatMessages.scrollHeight;
+    }
+
     addChatMessage(sender, text) {
         const container = this.elements.chatMessages;
         const messageDiv = document.createElement('div');
@@ -326,8 +369,8 @@ class QCYISApp {
     startConsciousnessSimulation() {
         setInterval(() => {
             if (this.ws && this.ws.readyState === WebSocket.OPEN) {
-                this.ws.send(JSON.stringify({ 
-                    type: 'consciousness_data', 
+                this.ws.send(MessagePack.encode({
+                    type: 'consciousness_data',
                     data: {
                         eeg: {
                             alpha: Math.random() * 12 + 8,
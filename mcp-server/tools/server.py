@@ -1,48 +1,106 @@
-from fastapi import FastAPI, HTTPException
-from pydantic import BaseModel
+from fastapi import Depends, FastAPI, HTTPException, Request, Response
+from fastapi.responses import JSONResponse
 from typing import Dict, List, Any, Optional
 import uvicorn
-import json
+import hashlib
+import msgspec
+import numpy as np
+import orjson
 import logging
-import asyncio
+import os
+import random
+import re
 from datetime import datetime
+from types import MappingProxyType
 
-# Configure logging
-logging.basicConfig(level=logging.INFO)
+# Configure logging (set LOG_LEVEL=WARNING in production to keep logging
+# off the request path)
+logging.basicConfig(level=os.getenv("LOG_LEVEL", "INFO").upper())
 logger = logging.getLogger(__name__)
 
+# Module-level RNG so the request path skips per-call import machinery
+_RNG = random.Random()
+
+class ORJSONResponse(JSONResponse):
+    """JSONResponse rendered with orjson - ~5-6x faster than stdlib json"""
+    media_type = "application/json"
+
+    def render(self, content: Any) -> bytes:
+        if isinstance(content, msgspec.Struct):
+            return msgspec.json.encode(content)
+        return orjson.dumps(content, default=str, option=orjson.OPT_NON_STR_KEYS)
+
 app = FastAPI(
     title="QCYIS MCP Server",
     description="Model Context Protocol Server for Yoga Intelligence Tools",
-    version="1.0.0"
+    version="1.0.0",
+    default_response_class=ORJSONResponse
 )
 
-# Pydantic models for request/response
-class PoseAnalysisRequest(BaseModel):
+@app.middleware("http")
+async def negotiate_msgpack(request: Request, call_next):
+    """Re-encode JSON responses as MessagePack when the client asks for it
+
+    Clients opt in with "Accept: application/msgpack"; everyone else gets
+    the JSON body untouched. MessagePack bodies are typically 20-30%
+    smaller and cheaper to parse than the equivalent JSON.
+    """
+    response = await call_next(request)
+
+    if ("application/msgpack" not in request.headers.get("accept", "")
+            or not response.headers.get("content-type", "").startswith("application/json")):
+        return response
+
+    body = b"".join([chunk async for chunk in response.body_iterator])
+    packed = msgspec.msgpack.encode(orjson.loads(body))
+
+    headers = {
+        k: v for k, v in response.headers.items()
+        if k.lower() not in ("content-length", "content-type")
+    }
+    return Response(
+        content=packed,
+        status_code=response.status_code,
+        headers=headers,
+        media_type="application/msgpack"
+    )
+
+# msgspec models for request/response - decoding straight from the raw
+# body is roughly an order of magnitude faster than Pydantic validation
+class PoseAnalysisRequest(msgspec.Struct):
     landmarks: List[Dict[str, float]]
     pose_type: str
     duration: Optional[float] = 0
 
-class BreathingRequest(BaseModel):
+class BreathingRequest(msgspec.Struct):
     pattern: str = "4-7-8"
     duration: int = 300  # seconds
 
-class MeditationRequest(BaseModel):
+class MeditationRequest(msgspec.Struct):
     theme: str = "mindfulness"
     duration: int = 600  # seconds
     level: str = "beginner"
 
-class RoutineRequest(BaseModel):
+class RoutineRequest(msgspec.Struct):
     level: str = "beginner"
     duration: int = 30  # minutes
     focus: str = "general"
     limitations: List[str] = []
 
-class ToolResponse(BaseModel):
+class ToolResponse(msgspec.Struct):
     success: bool
     data: Any
     message: str
 
+def msgspec_body(model):
+    """Dependency factory: decode the raw request body with msgspec"""
+    async def dependency(request: Request):
+        try:
+            return msgspec.json.decode(await request.body(), type=model)
+        except msgspec.DecodeError as e:
+            raise HTTPException(status_code=422, detail=str(e))
+    return dependency
+
 # Yoga pose reference database
 POSE_REFERENCES = {
     "mountain": {
@@ -89,7 +147,7 @@ BREATHING_PATTERNS = {
         "inhale": 4,
         "hold": 4,
         "exhale": 4,
-        "hold": 4,
+        "hold_after_exhale": 4,
         "description": "Balanced breath for focus"
     },
     "ujjayi": {
@@ -99,12 +157,176 @@ BREATHING_PATTERNS = {
     }
 }
 
+# Seconds per full breath cycle, computed once at import instead of summing
+# the pattern dict on every request
+for _pattern in BREATHING_PATTERNS.values():
+    _pattern["cycle_seconds"] = sum(v for v in _pattern.values() if isinstance(v, int))
+del _pattern
+
+# The library endpoints always return the same payload, so serialize it
+# once at import and serve the cached bytes
+# Correction suggestions per pose - a dict lookup replaces the old
+# if/elif chain in generate_pose_corrections
+_POSE_CORRECTIONS = {
+    "mountain": [
+        "Engage your core muscles",
+        "Lengthen through the crown of your head",
+        "Relax your shoulders away from your ears"
+    ],
+    "warrior_1": [
+        "Square your hips toward the front",
+        "Bend your front knee to 90 degrees",
+        "Keep your back leg straight and strong"
+    ],
+    "downward_dog": [
+        "Press firmly through your hands",
+        "Lengthen your spine",
+        "Pedal your feet to stretch your calves"
+    ]
+}
+
+_DEFAULT_CORRECTIONS = [
+    "Focus on your breath",
+    "Maintain steady alignment",
+    "Listen to your body"
+]
+
+# Limitation keyword -> (modification key, suggested modification),
+# matched with one precompiled case-insensitive scan per limitation
+_LIMITATION_MODIFICATIONS = {
+    "knee": ("knee_issues", "Use props, avoid deep lunges"),
+    "back": ("back_issues", "Avoid deep backbends, use support"),
+    "wrist": ("wrist_issues", "Use fists or forearms instead of palms"),
+    "neck": ("neck_issues", "Avoid inversions, keep head neutral")
+}
+_LIMITATION_RE = re.compile("|".join(_LIMITATION_MODIFICATIONS), re.IGNORECASE)
+
+# Landmark index triplets (point A, vertex, point C) for the four scored
+# joints, using MediaPipe pose indices; rows align with _POSE_REF_ANGLES
+_JOINT_TRIPLETS = np.array([
+    [11, 13, 15],  # left shoulder-elbow-wrist
+    [12, 14, 16],  # right shoulder-elbow-wrist
+    [23, 25, 27],  # left hip-knee-ankle
+    [24, 26, 28],  # right hip-knee-ankle
+])
+
+# Target joint angles per pose (left elbow, right elbow, left knee,
+# right knee), mirroring the backend's reference table
+_POSE_REF_ANGLES = {
+    "mountain": np.array([180, 180, 180, 180], dtype=np.float32),
+    "warrior_1": np.array([180, 180, 90, 180], dtype=np.float32),
+    "downward_dog": np.array([180, 180, 180, 180], dtype=np.float32)
+}
+
+# Static reference tables hoisted out of the helpers so they are built
+# once at import instead of on every request
+_BREATHING_BENEFITS = {
+    "4-7-8": [
+        "Reduces anxiety and stress",
+        "Promotes better sleep",
+        "Calms the nervous system"
+    ],
+    "box": [
+        "Improves focus and concentration",
+        "Balances the nervous system",
+        "Enhances mental clarity"
+    ],
+    "ujjayi": [
+        "Builds internal heat",
+        "Maintains focus during yoga",
+        "Calms the mind"
+    ]
+}
+
+_DEFAULT_BENEFITS = ["Promotes relaxation", "Improves breath awareness"]
+
+_MEDITATION_GUIDES = {
+    "mindfulness": {
+        "introduction": "Focus on present moment awareness",
+        "technique": "Observe thoughts without judgment",
+        "anchor": "Breath or body sensations"
+    },
+    "loving_kindness": {
+        "introduction": "Cultivate compassion and love",
+        "technique": "Send loving wishes to yourself and others",
+        "anchor": "Heart center and loving phrases"
+    },
+    "body_scan": {
+        "introduction": "Systematic awareness of the body",
+        "technique": "Move attention through each body part",
+        "anchor": "Physical sensations"
+    }
+}
+
+_MEDITATION_BASE_STEPS = [
+    "Settle into a comfortable position",
+    "Close your eyes and take three deep breaths",
+    "Begin to notice your natural breathing rhythm"
+]
+
+_MEDITATION_THEME_STEPS = {
+    "mindfulness": [
+        "When thoughts arise, simply notice them",
+        "Gently return attention to your breath",
+        "Continue observing with kind awareness"
+    ],
+    "loving_kindness": [
+        "Place hand on heart and feel its rhythm",
+        "Silently repeat: 'May I be happy and peaceful'",
+        "Extend these wishes to loved ones, then all beings"
+    ],
+    "body_scan": [
+        "Start by noticing the top of your head",
+        "Slowly move attention down through your body",
+        "Notice sensations without trying to change them"
+    ]
+}
+
+_ROUTINES = {
+    "beginner": {
+        "warm_up": ["Mountain Pose", "Arm Circles", "Neck Rolls"],
+        "main_poses": ["Cat-Cow", "Downward Dog", "Child's Pose", "Warrior I"],
+        "cool_down": ["Seated Forward Fold", "Supine Twist", "Savasana"]
+    },
+    "intermediate": {
+        "warm_up": ["Sun Salutation A", "Standing Forward Fold"],
+        "main_poses": ["Warrior II", "Triangle Pose", "Tree Pose", "Bridge Pose"],
+        "cool_down": ["Pigeon Pose", "Happy Baby", "Savasana"]
+    },
+    "advanced": {
+        "warm_up": ["Sun Salutation B", "Standing Poses Flow"],
+        "main_poses": ["Crow Pose", "Headstand Prep", "Wheel Pose", "Eagle Pose"],
+        "cool_down": ["King Pigeon", "Lotus Prep", "Meditation"]
+    }
+}
+
+_POSE_LIBRARY_BYTES = orjson.dumps({
+    "success": True,
+    "data": POSE_REFERENCES,
+    "message": "Pose library retrieved successfully"
+})
+_BREATHING_PATTERNS_BYTES = orjson.dumps({
+    "success": True,
+    "data": BREATHING_PATTERNS,
+    "message": "Breathing patterns retrieved successfully"
+})
+
+# Strong ETags over the cached bytes let returning clients revalidate
+# with a 304 instead of re-downloading the payload
+_POSE_LIBRARY_ETAG = f'"{hashlib.sha256(_POSE_LIBRARY_BYTES).hexdigest()[:16]}"'
+_BREATHING_PATTERNS_ETAG = f'"{hashlib.sha256(_BREATHING_PATTERNS_BYTES).hexdigest()[:16]}"'
+
+# Freeze the reference tables (after cycle_seconds and the cached bytes
+# above) so request handlers can't accidentally mutate shared state
+POSE_REFERENCES = MappingProxyType(POSE_REFERENCES)
+BREATHING_PATTERNS = MappingProxyType(BREATHING_PATTERNS)
+
 @app.get("/")
 async def root():
     return {"message": "QCYIS MCP Server is running", "version": "1.0.0"}
 
-@app.post("/tools/analyze_pose", response_model=ToolResponse)
-async def analyze_pose(request: PoseAnalysisRequest):
+@app.post("/tools/analyze_pose")
+async def analyze_pose(request: PoseAnalysisRequest = Depends(msgspec_body(PoseAnalysisRequest))):
     """Analyze yoga pose and provide detailed feedback"""
     try:
         pose_type = request.pose_type.lower()
@@ -114,10 +336,10 @@ async def analyze_pose(request: PoseAnalysisRequest):
             pose_type = "general_pose"
         
         # Calculate pose quality (simplified)
-        quality_score = await calculate_pose_quality(landmarks, pose_type)
+        quality_score = calculate_pose_quality(landmarks, pose_type)
         
         # Generate corrections
-        corrections = await generate_pose_corrections(landmarks, pose_type)
+        corrections = generate_pose_corrections(landmarks, pose_type)
         
         # Get pose information
         pose_info = POSE_REFERENCES.get(pose_type, {})
@@ -127,25 +349,25 @@ async def analyze_pose(request: PoseAnalysisRequest):
             "quality_score": quality_score,
             "corrections": corrections,
             "pose_info": pose_info,
-            "timestamp": datetime.now().isoformat()
+            "timestamp": datetime.now()  # orjson serializes datetime natively
         }
         
-        return ToolResponse(
+        return ORJSONResponse(ToolResponse(
             success=True,
             data=analysis_result,
             message=f"Pose analysis completed for {pose_type}"
-        )
+        ))
         
     except Exception as e:
-        logger.error(f"Pose analysis error: {e}")
-        return ToolResponse(
+        logger.error("Pose analysis error: %s", e)
+        return ORJSONResponse(ToolResponse(
             success=False,
             data={},
             message=f"Analysis failed: {str(e)}"
-        )
+        ))
 
-@app.post("/tools/breathing_guide", response_model=ToolResponse)
-async def breathing_guide(request: BreathingRequest):
+@app.post("/tools/breathing_guide")
+async def breathing_guide(request: BreathingRequest = Depends(msgspec_body(BreathingRequest))):
     """Generate breathing exercise instructions"""
     try:
         pattern = request.pattern.lower()
@@ -155,146 +377,140 @@ async def breathing_guide(request: BreathingRequest):
             pattern = "4-7-8"
         
         breath_pattern = BREATHING_PATTERNS[pattern]
-        cycles = duration // sum([v for k, v in breath_pattern.items() if isinstance(v, int)])
+        cycles = duration // breath_pattern["cycle_seconds"]
         
         instructions = {
             "pattern": pattern,
             "description": breath_pattern["description"],
             "duration_seconds": duration,
             "estimated_cycles": cycles,
-            "instructions": await generate_breathing_instructions(breath_pattern, cycles),
-            "benefits": await get_breathing_benefits(pattern)
+            "instructions": generate_breathing_instructions(breath_pattern, cycles),
+            "benefits": get_breathing_benefits(pattern)
         }
         
-        return ToolResponse(
+        return ORJSONResponse(ToolResponse(
             success=True,
             data=instructions,
             message=f"Breathing guide generated for {pattern} pattern"
-        )
+        ))
         
     except Exception as e:
-        logger.error(f"Breathing guide error: {e}")
-        return ToolResponse(
+        logger.error("Breathing guide error: %s", e)
+        return ORJSONResponse(ToolResponse(
             success=False,
             data={},
             message=f"Guide generation failed: {str(e)}"
-        )
+        ))
 
-@app.post("/tools/meditation_prompt", response_model=ToolResponse)
-async def meditation_prompt(request: MeditationRequest):
+@app.post("/tools/meditation_prompt")
+async def meditation_prompt(request: MeditationRequest = Depends(msgspec_body(MeditationRequest))):
     """Generate meditation guidance and prompts"""
     try:
         theme = request.theme.lower()
         duration = request.duration
         level = request.level.lower()
         
-        meditation_guide = await generate_meditation_guide(theme, duration, level)
+        meditation_guide = generate_meditation_guide(theme, duration, level)
         
-        return ToolResponse(
+        return ORJSONResponse(ToolResponse(
             success=True,
             data=meditation_guide,
             message=f"Meditation prompt generated for {theme} theme"
-        )
+        ))
         
     except Exception as e:
-        logger.error(f"Meditation prompt error: {e}")
-        return ToolResponse(
+        logger.error("Meditation prompt error: %s", e)
+        return ORJSONResponse(ToolResponse(
             success=False,
             data={},
             message=f"Prompt generation failed: {str(e)}"
-        )
+        ))
 
-@app.post("/tools/generate_routine", response_model=ToolResponse)
-async def generate_routine(request: RoutineRequest):
+@app.post("/tools/generate_routine")
+async def generate_routine(request: RoutineRequest = Depends(msgspec_body(RoutineRequest))):
     """Generate personalized yoga routine"""
     try:
-        routine = await create_yoga_routine(
+        routine = create_yoga_routine(
             level=request.level,
             duration=request.duration,
             focus=request.focus,
             limitations=request.limitations
         )
         
-        return ToolResponse(
+        return ORJSONResponse(ToolResponse(
             success=True,
             data=routine,
             message=f"Yoga routine generated for {request.level} level"
-        )
+        ))
         
     except Exception as e:
-        logger.error(f"Routine generation error: {e}")
-        return ToolResponse(
+        logger.error("Routine generation error: %s", e)
+        return ORJSONResponse(ToolResponse(
             success=False,
             data={},
             message=f"Routine generation failed: {str(e)}"
-        )
+        ))
 
 @app.get("/tools/pose_library")
-async def get_pose_library():
+async def get_pose_library(request: Request):
     """Get complete pose library with descriptions"""
-    return ToolResponse(
-        success=True,
-        data=POSE_REFERENCES,
-        message="Pose library retrieved successfully"
+    if request.headers.get("if-none-match") == _POSE_LIBRARY_ETAG:
+        return Response(status_code=304)
+    return Response(
+        content=_POSE_LIBRARY_BYTES,
+        media_type="application/json",
+        headers={"ETag": _POSE_LIBRARY_ETAG, "Cache-Control": "public, max-age=3600"}
     )
 
 @app.get("/tools/breathing_patterns")
-async def get_breathing_patterns():
+async def get_breathing_patterns(request: Request):
     """Get available breathing patterns"""
-    return ToolResponse(
-        success=True,
-        data=BREATHING_PATTERNS,
-        message="Breathing patterns retrieved successfully"
+    if request.headers.get("if-none-match") == _BREATHING_PATTERNS_ETAG:
+        return Response(status_code=304)
+    return Response(
+        content=_BREATHING_PATTERNS_BYTES,
+        media_type="application/json",
+        headers={"ETag": _BREATHING_PATTERNS_ETAG, "Cache-Control": "public, max-age=3600"}
     )
 
 # Helper functions
-async def calculate_pose_quality(landmarks: List[Dict], pose_type: str) -> float:
+def calculate_pose_quality(landmarks: List[Dict], pose_type: str) -> float:
     """Calculate pose quality score based on landmarks"""
     if not landmarks:
         return 0.0
-    
-    # Simplified quality calculation
+
+    reference = _POSE_REF_ANGLES.get(pose_type)
+    if reference is not None and len(landmarks) > _JOINT_TRIPLETS.max():
+        # Score against the reference angles: one (4, 3, 2) fancy-indexed
+        # gather and a vectorized angle computation for all joints at once
+        coords = np.array(
+            [(lm.get("x", 0.0), lm.get("y", 0.0)) for lm in landmarks],
+            dtype=np.float32
+        )
+        triplets = coords[_JOINT_TRIPLETS]
+        v1 = triplets[:, 0] - triplets[:, 1]
+        v2 = triplets[:, 2] - triplets[:, 1]
+        cosines = (v1 * v2).sum(axis=1) / (
+            np.linalg.norm(v1, axis=1) * np.linalg.norm(v2, axis=1) + 1e-9
+        )
+        angles = np.degrees(np.arccos(np.clip(cosines, -1.0, 1.0)))
+
+        average_error = float(np.abs(angles - reference).mean()) / 180.0
+        quality = max(0.0, 100.0 - average_error * 100.0)
+        return round(quality, 1)
+
+    # No reference or too few landmarks - fall back to the demo estimate
     base_score = 75.0
-    
-    # Add randomness for demonstration
-    import random
-    variation = random.uniform(-15, 25)
+    variation = _RNG.uniform(-15, 25)
     quality = max(0, min(100, base_score + variation))
-    
+
     return round(quality, 1)
 
-async def generate_pose_corrections(landmarks: List[Dict], pose_type: str) -> List[str]:
+def generate_pose_corrections(landmarks: List[Dict], pose_type: str) -> List[str]:
     """Generate pose correction suggestions"""
-    corrections = []
-    
-    if pose_type == "mountain":
-        corrections = [
-            "Engage your core muscles",
-            "Lengthen through the crown of your head",
-            "Relax your shoulders away from your ears"
-        ]
-    elif pose_type == "warrior_1":
-        corrections = [
-            "Square your hips toward the front",
-            "Bend your front knee to 90 degrees",
-            "Keep your back leg straight and strong"
-        ]
-    elif pose_type == "downward_dog":
-        corrections = [
-            "Press firmly through your hands",
-            "Lengthen your spine",
-            "Pedal your feet to stretch your calves"
-        ]
-    else:
-        corrections = [
-            "Focus on your breath",
-            "Maintain steady alignment",
-            "Listen to your body"
-        ]
-    
-    return corrections
+    return _POSE_CORRECTIONS.get(pose_type, _DEFAULT_CORRECTIONS)
 
-async def generate_breathing_instructions(pattern: Dict, cycles: int) -> List[str]:
+def generate_breathing_instructions(pattern: Dict, cycles: int) -> List[str]:
     """Generate step-by-step breathing instructions"""
     instructions = [
         "Find a comfortable seated position",
@@ -303,65 +519,24 @@ async def generate_breathing_instructions(pattern: Dict, cycles: int) -> List[st
     ]
     
     if "inhale" in pattern and "exhale" in pattern:
+        instructions.append(f"Inhale for {pattern['inhale']} counts")
         if "hold" in pattern:
-            instructions.extend([
-                f"Inhale for {pattern['inhale']} counts",
-                f"Hold for {pattern['hold']} counts",
-                f"Exhale for {pattern['exhale']} counts",
-                f"Repeat for {cycles} cycles"
-            ])
-        else:
-            instructions.extend([
-                f"Inhale for {pattern['inhale']} counts",
-                f"Exhale for {pattern['exhale']} counts",
-                f"Repeat for {cycles} cycles"
-            ])
+            instructions.append(f"Hold for {pattern['hold']} counts")
+        instructions.append(f"Exhale for {pattern['exhale']} counts")
+        if "hold_after_exhale" in pattern:
+            instructions.append(f"Hold empty for {pattern['hold_after_exhale']} counts")
+        instructions.append(f"Repeat for {cycles} cycles")
     
     instructions.append("Return to natural breathing when complete")
     return instructions
 
-async def get_breathing_benefits(pattern: str) -> List[str]:
+def get_breathing_benefits(pattern: str) -> List[str]:
     """Get benefits of specific breathing pattern"""
-    benefits = {
-        "4-7-8": [
-            "Reduces anxiety and stress",
-            "Promotes better sleep",
-            "Calms the nervous system"
-        ],
-        "box": [
-            "Improves focus and concentration",
-            "Balances the nervous system",
-            "Enhances mental clarity"
-        ],
-        "ujjayi": [
-            "Builds internal heat",
-            "Maintains focus during yoga",
-            "Calms the mind"
-        ]
-    }
-    return benefits.get(pattern, ["Promotes relaxation", "Improves breath awareness"])
+    return _BREATHING_BENEFITS.get(pattern, _DEFAULT_BENEFITS)
 
-async def generate_meditation_guide(theme: str, duration: int, level: str) -> Dict:
+def generate_meditation_guide(theme: str, duration: int, level: str) -> Dict:
     """Generate comprehensive meditation guide"""
-    guides = {
-        "mindfulness": {
-            "introduction": "Focus on present moment awareness",
-            "technique": "Observe thoughts without judgment",
-            "anchor": "Breath or body sensations"
-        },
-        "loving_kindness": {
-            "introduction": "Cultivate compassion and love",
-            "technique": "Send loving wishes to yourself and others",
-            "anchor": "Heart center and loving phrases"
-        },
-        "body_scan": {
-            "introduction": "Systematic awareness of the body",
-            "technique": "Move attention through each body part",
-            "anchor": "Physical sensations"
-        }
-    }
-    
-    guide = guides.get(theme, guides["mindfulness"])
+    guide = _MEDITATION_GUIDES.get(theme, _MEDITATION_GUIDES["mindfulness"])
     
     return {
         "theme": theme,
@@ -370,60 +545,17 @@ async def generate_meditation_guide(theme: str, duration: int, level: str) -> Di
         "introduction": guide["introduction"],
         "technique": guide["technique"],
         "anchor": guide["anchor"],
-        "steps": await generate_meditation_steps(theme, duration, level),
+        "steps": generate_meditation_steps(theme, duration, level),
         "closing": "Gently return awareness to your surroundings"
     }
 
-async def generate_meditation_steps(theme: str, duration: int, level: str) -> List[str]:
+def generate_meditation_steps(theme: str, duration: int, level: str) -> List[str]:
     """Generate meditation steps based on theme and level"""
-    base_steps = [
-        "Settle into a comfortable position",
-        "Close your eyes and take three deep breaths",
-        "Begin to notice your natural breathing rhythm"
-    ]
-    
-    if theme == "mindfulness":
-        base_steps.extend([
-            "When thoughts arise, simply notice them",
-            "Gently return attention to your breath",
-            "Continue observing with kind awareness"
-        ])
-    elif theme == "loving_kindness":
-        base_steps.extend([
-            "Place hand on heart and feel its rhythm",
-            "Silently repeat: 'May I be happy and peaceful'",
-            "Extend these wishes to loved ones, then all beings"
-        ])
-    elif theme == "body_scan":
-        base_steps.extend([
-            "Start by noticing the top of your head",
-            "Slowly move attention down through your body",
-            "Notice sensations without trying to change them"
-        ])
-    
-    return base_steps
+    return _MEDITATION_BASE_STEPS + _MEDITATION_THEME_STEPS.get(theme, [])
 
-async def create_yoga_routine(level: str, duration: int, focus: str, limitations: List[str]) -> Dict:
+def create_yoga_routine(level: str, duration: int, focus: str, limitations: List[str]) -> Dict:
     """Create personalized yoga routine"""
-    routines = {
-        "beginner": {
-            "warm_up": ["Mountain Pose", "Arm Circles", "Neck Rolls"],
-            "main_poses": ["Cat-Cow", "Downward Dog", "Child's Pose", "Warrior I"],
-            "cool_down": ["Seated Forward Fold", "Supine Twist", "Savasana"]
-        },
-        "intermediate": {
-            "warm_up": ["Sun Salutation A", "Standing Forward Fold"],
-            "main_poses": ["Warrior II", "Triangle Pose", "Tree Pose", "Bridge Pose"],
-            "cool_down": ["Pigeon Pose", "Happy Baby", "Savasana"]
-        },
-        "advanced": {
-            "warm_up": ["Sun Salutation B", "Standing Poses Flow"],
-            "main_poses": ["Crow Pose", "Headstand Prep", "Wheel Pose", "Eagle Pose"],
-            "cool_down": ["King Pigeon", "Lotus Prep", "Meditation"]
-        }
-    }
-    
-    routine = routines.get(level, routines["beginner"])
+    routine = _ROUTINES.get(level, _ROUTINES["beginner"])
     
     return {
         "level": level,
@@ -438,24 +570,29 @@ async def create_yoga_routine(level: str, duration: int, focus: str, limitations
             "main_sequence": duration * 0.6,
             "cool_down": duration * 0.2
         },
-        "modifications": await get_modifications_for_limitations(limitations)
+        "modifications": get_modifications_for_limitations(limitations)
     }
 
-async def get_modifications_for_limitations(limitations: List[str]) -> Dict[str, str]:
+def get_modifications_for_limitations(limitations: List[str]) -> Dict[str, str]:
     """Get pose modifications based on limitations"""
     modifications = {}
     
     for limitation in limitations:
-        if "knee" in limitation.lower():
-            modifications["knee_issues"] = "Use props, avoid deep lunges"
-        elif "back" in limitation.lower():
-            modifications["back_issues"] = "Avoid deep backbends, use support"
-        elif "wrist" in limitation.lower():
-            modifications["wrist_issues"] = "Use fists or forearms instead of palms"
-        elif "neck" in limitation.lower():
-            modifications["neck_issues"] = "Avoid inversions, keep head neutral"
+        match = _LIMITATION_RE.search(limitation)
+        if match:
+            key, modification = _LIMITATION_MODIFICATIONS[match.group().lower()]
+            modifications[key] = modification
     
     return modifications
 
 if __name__ == "__main__":
-    uvicorn.run(app, host="127.0.0.1", port=8033, log_level="info")
+    # uvloop + httptools (bundled with uvicorn[standard]) cut event-loop
+    # and HTTP-parsing overhead versus the pure-Python defaults
+    uvicorn.run(
+        app,
+        host="127.0.0.1",
+        port=8033,
+        log_level="info",
+        loop="uvloop",
+        http="httptools"
+    )
@@ -0,0 +1,49 @@
+"""Smoke tests for the MCP tool endpoints."""
+from fastapi.testclient import TestClient
+
+from server import app
+
+client = TestClient(app)
+
+def test_analyze_pose():
+    response = client.post("/tools/analyze_pose", json={
+        "landmarks": [{"x": 0.5, "y": 0.5, "z": 0.0}] * 33,
+        "pose_type": "mountain"
+    })
+    assert response.status_code == 200
+    body = response.json()
+    assert body["success"] is True
+    assert body["data"]["pose_type"] == "mountain"
+
+def test_breathing_guide():
+    response = client.post("/tools/breathing_guide", json={
+        "pattern": "box",
+        "duration": 320
+    })
+    assert response.status_code == 200
+    body = response.json()
+    assert body["success"] is True
+    assert body["data"]["estimated_cycles"] == 20
+
+def test_meditation_prompt():
+    response = client.post("/tools/meditation_prompt", json={
+        "theme": "mindfulness"
+    })
+    assert response.status_code == 200
+    body = response.json()
+    assert body["success"] is True
+    assert body["data"]["theme"] == "mindfulness"
+
+def test_generate_routine():
+    response = client.post("/tools/generate_routine", json={
+        "level": "beginner",
+        "limitations": ["bad knee"]
+    })
+    assert response.status_code == 200
+    body = response.json()
+    assert body["success"] is True
+    assert "knee_issues" in body["data"]["modifications"]
+
+def test_invalid_body_returns_422():
+    response = client.post("/tools/analyze_pose", json={"pose_type": "mountain"})
+    assert response.status_code == 422